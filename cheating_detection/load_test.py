@@ -0,0 +1,800 @@
+"""
+Load generator and soak test for the cheating detection service.
+Simulates N concurrent interview sessions, each sending frames at a fixed rate,
+and reports throughput, latency percentiles and dropped/timed-out frames.
+
+Usage:
+    python load_test.py run --sessions 10 --fps 1 --duration 60
+    python load_test.py sweep --start 2 --step 2 --max 64 --fps 1
+    python load_test.py soak --sessions 8 --fps 1 --duration 14400 --in-process
+
+By default requests go to a running instance (--url). With --in-process the
+FastAPI app from main.py is started inside this process on a free port, which
+also allows object-count sampling (--track-objects). Note that in-process the
+load generator shares the interpreter with the service, so absolute numbers
+are pessimistic.
+"""
+
+import argparse
+import base64
+import gc
+import math
+import os
+import socket
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+import requests
+
+SERVICE_URL = "http://localhost:8000"
+
+# Requests slower than this are cut off by the proxy in front of the service
+PROXY_TIMEOUT = 5.0
+
+SERVICE_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(SERVICE_DIR)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted list.
+
+    Args:
+        sorted_values: Values sorted in ascending order
+        pct: Percentile in the range 0-100
+
+    Returns:
+        The percentile value, or 0.0 for an empty list
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def load_frame(image_path: Optional[str]) -> bytes:
+    """
+    Load the JPEG frame sent by every simulated session.
+
+    Args:
+        image_path: Path to an image file, or None to synthesize a 640x480 frame
+
+    Returns:
+        Encoded image bytes
+    """
+    if image_path:
+        with open(image_path, "rb") as f:
+            return f.read()
+
+    import cv2
+    import numpy as np
+
+    # Random noise compresses poorly, so this is a realistic worst-case webcam frame size
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 256, size=(480, 640, 3), dtype=np.uint8)
+    ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    if not ok:
+        raise RuntimeError("Failed to encode synthetic frame")
+    return encoded.tobytes()
+
+
+def _free_port() -> int:
+    """Ask the OS for an unused local TCP port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_in_process_server() -> str:
+    """
+    Start the FastAPI app from main.py in a background thread.
+
+    Returns:
+        Base URL of the started server
+    """
+    import uvicorn
+
+    # main.py imports the services package that lives next to this script
+    for path in (SERVICE_DIR, REPO_ROOT):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    from main import app
+
+    port = _free_port()
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    deadline = time.monotonic() + 60
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("In-process server failed to start")
+        time.sleep(0.1)
+
+    return f"http://127.0.0.1:{port}"
+
+
+class MemorySampler:
+    """
+    Samples RSS (and, in-process, live object counts) over time.
+
+    RSS is read from /proc, so the RSS trend is only available on Linux.
+
+    Object counting runs gc.collect() and walks every live object while holding
+    the GIL, so in-process it pauses the service and adds latency to the frames
+    in flight. The counts also include the load generator's own objects.
+    """
+
+    # A growth trend needs enough post-warm-up samples over a long enough span;
+    # shorter runs are dominated by start-up allocations
+    MIN_TREND_SAMPLES = 5
+    MIN_TREND_SPAN = 600.0
+
+    def __init__(self, pid: Optional[int] = None, track_objects: bool = False,
+                 warmup: float = 0.0):
+        """
+        Args:
+            pid: Process to sample (default: this process)
+            track_objects: Also record gc-tracked object counts by type
+            warmup: Seconds after start excluded from the RSS trend and object baseline
+        """
+        self.pid = pid or os.getpid()
+        self.track_objects = track_objects
+        self.warmup = warmup
+        self.samples: List[Dict] = []
+        self._baseline_types: Optional[Counter] = None
+        self._latest_types: Optional[Counter] = None
+
+    def _read_rss_mb(self) -> Optional[float]:
+        """
+        Read the current resident set size in MB, or None if unavailable.
+
+        There is deliberately no ru_maxrss fallback: peak RSS never goes down,
+        so fitting a growth trend to it would be meaningless.
+        """
+        try:
+            with open(f"/proc/{self.pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) / 1024.0
+        except OSError:
+            pass
+        return None
+
+    def sample(self, elapsed: float) -> Dict:
+        """
+        Take one sample.
+
+        Args:
+            elapsed: Seconds since the test started
+
+        Returns:
+            Dictionary with elapsed, rss_mb and (optionally) objects and
+            pause, the seconds spent counting objects
+        """
+        entry = {"elapsed": elapsed, "rss_mb": self._read_rss_mb()}
+        if self.track_objects:
+            pause_started = time.perf_counter()
+            gc.collect()
+            types = Counter(type(obj).__name__ for obj in gc.get_objects())
+            entry["pause"] = time.perf_counter() - pause_started
+            # Baseline after warm-up so sessions and model set-up cancel out
+            if self._baseline_types is None and elapsed >= self.warmup:
+                self._baseline_types = types
+            self._latest_types = types
+            entry["objects"] = sum(types.values())
+        self.samples.append(entry)
+        return entry
+
+    def rss_slope_mb_per_hour(self) -> Optional[float]:
+        """
+        Least-squares slope of RSS over time, excluding samples taken during warm-up.
+
+        Returns:
+            Growth in MB/hour, or None with fewer than MIN_TREND_SAMPLES samples
+            or a span shorter than MIN_TREND_SPAN seconds after warm-up
+        """
+        points = [
+            (s["elapsed"], s["rss_mb"]) for s in self.samples
+            if s["rss_mb"] is not None and s["elapsed"] >= self.warmup
+        ]
+        if len(points) < self.MIN_TREND_SAMPLES:
+            return None
+        if points[-1][0] - points[0][0] < self.MIN_TREND_SPAN:
+            return None
+
+        mean_t = sum(t for t, _ in points) / len(points)
+        mean_r = sum(r for _, r in points) / len(points)
+        var_t = sum((t - mean_t) ** 2 for t, _ in points)
+        if var_t == 0:
+            return None
+        cov = sum((t - mean_t) * (r - mean_r) for t, r in points)
+        return cov / var_t * 3600.0
+
+    def top_growing_types(self, limit: int = 10) -> List[tuple]:
+        """
+        Object types whose live count grew the most since the first sample.
+
+        Args:
+            limit: Maximum number of types to return
+
+        Returns:
+            List of (type name, growth) tuples, largest growth first
+        """
+        if self._baseline_types is None or self._latest_types is None:
+            return []
+        growth = Counter(self._latest_types)
+        growth.subtract(self._baseline_types)
+        return [(name, count) for name, count in growth.most_common(limit) if count > 0]
+
+
+class LoadStats:
+    """
+    Thread-safe accumulator for per-frame results.
+
+    Frames are attributed to a measurement window by the time they were sent,
+    so frames started during warm-up or after the window closed are ignored,
+    while frames sent inside the window are counted even if they finish later.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.window_start: Optional[float] = None
+        self.window_end: Optional[float] = None
+        self.reset()
+
+    def reset(self):
+        """Clear all counters (used between soak reporting windows)."""
+        with self._lock:
+            self.latencies: List[float] = []
+            self.sent = 0
+            self.ok = 0
+            self.errors = 0
+            self.timeouts = 0
+            self.dropped = 0
+
+    def open_window(self, now: float):
+        """Start counting frames sent from now on and discard earlier results."""
+        self.reset()
+        with self._lock:
+            self.window_start = now
+            self.window_end = None
+
+    def close_window(self, now: float):
+        """Stop counting frames sent from now on."""
+        with self._lock:
+            self.window_end = now
+
+    def _in_window(self, sent_at: float) -> bool:
+        """Check whether a frame sent at sent_at belongs to the current window."""
+        if self.window_start is not None and sent_at < self.window_start:
+            return False
+        return self.window_end is None or sent_at < self.window_end
+
+    def record(self, sent_at: float, latency: float, status: str):
+        """
+        Record the outcome of one frame.
+
+        Args:
+            sent_at: perf_counter() time the frame was sent
+            latency: Round-trip time in seconds (the client timeout for timeouts)
+            status: One of "ok", "error" or "timeout"
+        """
+        with self._lock:
+            if not self._in_window(sent_at):
+                return
+            self.sent += 1
+            # Failed frames stay in the latency distribution so the tail is visible
+            self.latencies.append(latency)
+            if status == "ok":
+                self.ok += 1
+            elif status == "timeout":
+                self.timeouts += 1
+            else:
+                self.errors += 1
+
+    def record_dropped(self, due_at: float, count: int):
+        """
+        Record frames a session skipped because the previous one was still in flight.
+
+        Args:
+            due_at: perf_counter() time the first skipped frame was due
+            count: Number of skipped frames
+        """
+        if count:
+            with self._lock:
+                if self._in_window(due_at):
+                    self.dropped += count
+
+    def summary(self, elapsed: float, offered_fps: float) -> Dict:
+        """
+        Summarize everything recorded so far.
+
+        Args:
+            elapsed: Wall-clock duration covered by these stats in seconds
+            offered_fps: Total frames per second the sessions tried to send
+
+        Returns:
+            Dictionary of throughput, latency percentiles and failure counts
+        """
+        with self._lock:
+            latencies = sorted(self.latencies)
+            sent, ok = self.sent, self.ok
+            errors, timeouts, dropped = self.errors, self.timeouts, self.dropped
+
+        attempted = sent + dropped
+        return {
+            "elapsed": elapsed,
+            "offered_fps": offered_fps,
+            "throughput_fps": ok / elapsed if elapsed > 0 else 0.0,
+            "sent": sent,
+            "ok": ok,
+            "errors": errors,
+            "timeouts": timeouts,
+            "dropped": dropped,
+            "failure_rate": (errors + timeouts + dropped) / attempted if attempted else 0.0,
+            "p50": percentile(latencies, 50),
+            "p90": percentile(latencies, 90),
+            "p99": percentile(latencies, 99),
+            "max": latencies[-1] if latencies else 0.0,
+        }
+
+
+class StatsGroup:
+    """Forwards frame results to several LoadStats, e.g. one per window and one for the run."""
+
+    def __init__(self, *members: LoadStats):
+        self.members = list(members)
+
+    def record(self, sent_at: float, latency: float, status: str):
+        """Record the outcome of one frame in every member."""
+        for stats in self.members:
+            stats.record(sent_at, latency, status)
+
+    def record_dropped(self, due_at: float, count: int):
+        """Record skipped frames in every member."""
+        for stats in self.members:
+            stats.record_dropped(due_at, count)
+
+
+class SessionWorker(threading.Thread):
+    """
+    One simulated interview session sending frames at a fixed rate.
+
+    A session never has more than one frame in flight, like the browser client.
+    Ticks that pass while a request is still pending are counted as dropped.
+    """
+
+    def __init__(self, index: int, url: str, frame: bytes, fps: float,
+                 timeout: float, use_base64: bool, stats: LoadStats,
+                 stop_event: threading.Event, start_offset: float):
+        super().__init__(name=f"session-{index}", daemon=True)
+        self.url = url
+        self.frame = frame
+        self.interval = 1.0 / fps
+        self.timeout = timeout
+        self.use_base64 = use_base64
+        self.stats = stats
+        self.stop_event = stop_event
+        self.start_offset = start_offset
+
+        if use_base64:
+            self.payload = {"image": base64.b64encode(frame).decode("utf-8")}
+
+    def _send_frame(self, http: requests.Session):
+        """Send a single frame and record its outcome."""
+        started = time.perf_counter()
+        try:
+            if self.use_base64:
+                response = http.post(f"{self.url}/detect-cheating-base64",
+                                     json=self.payload, timeout=self.timeout)
+            else:
+                files = {"file": ("frame.jpg", self.frame, "image/jpeg")}
+                response = http.post(f"{self.url}/detect-cheating",
+                                     files=files, timeout=self.timeout)
+            latency = time.perf_counter() - started
+            self.stats.record(started, latency, "ok" if response.status_code == 200 else "error")
+        except requests.exceptions.Timeout:
+            self.stats.record(started, self.timeout, "timeout")
+        except requests.exceptions.RequestException:
+            self.stats.record(started, time.perf_counter() - started, "error")
+
+    def run(self):
+        # Stagger session start so frames are spread across the interval
+        if self.stop_event.wait(self.start_offset):
+            return
+
+        next_tick = time.perf_counter()
+        with requests.Session() as http:
+            while not self.stop_event.is_set():
+                self._send_frame(http)
+
+                now = time.perf_counter()
+                missed = max(0, int((now - next_tick) // self.interval))
+                self.stats.record_dropped(next_tick + self.interval, missed)
+                next_tick += (missed + 1) * self.interval
+
+                delay = next_tick - time.perf_counter()
+                if delay > 0 and self.stop_event.wait(delay):
+                    return
+
+
+def start_sessions(args, url: str, frame: bytes, sessions: int,
+                   stats: LoadStats) -> tuple:
+    """
+    Launch session workers.
+
+    Returns:
+        Tuple of (stop event, list of workers)
+    """
+    stop_event = threading.Event()
+    interval = 1.0 / args.fps
+    workers = [
+        SessionWorker(i, url, frame, args.fps, args.timeout, args.base64,
+                      stats, stop_event, start_offset=interval * i / sessions)
+        for i in range(sessions)
+    ]
+    for worker in workers:
+        worker.start()
+    return stop_event, workers
+
+
+def stop_sessions(stop_event: threading.Event, workers: List[SessionWorker], timeout: float):
+    """Signal workers to stop and wait for in-flight frames to finish."""
+    stop_event.set()
+    for worker in workers:
+        worker.join(timeout + 1.0)
+
+
+def run_load(args, url: str, frame: bytes, sessions: int) -> Dict:
+    """
+    Run a fixed number of sessions for args.duration seconds.
+
+    Only frames sent inside the measurement window are counted; frames still in
+    flight when it closes are waited for, so slow tail requests are included.
+
+    Returns:
+        Summary dictionary from LoadStats.summary, with "interrupted" set
+        if Ctrl-C ended the window early
+    """
+    stats = LoadStats()
+    stop_event, workers = start_sessions(args, url, frame, sessions, stats)
+
+    interrupted = False
+    window_start = time.perf_counter()
+    try:
+        # Discard warm-up so connection setup and model warm-up don't skew percentiles
+        if args.warmup > 0:
+            time.sleep(args.warmup)
+        window_start = time.perf_counter()
+        stats.open_window(window_start)
+        time.sleep(args.duration)
+    except KeyboardInterrupt:
+        interrupted = True
+
+    window_end = time.perf_counter()
+    stats.close_window(window_end)
+    if interrupted:
+        print("\nInterrupted, waiting for in-flight frames...")
+    stop_sessions(stop_event, workers, args.timeout)
+
+    summary = stats.summary(window_end - window_start, sessions * args.fps)
+    summary["sessions"] = sessions
+    summary["interrupted"] = interrupted
+    return summary
+
+
+def is_saturated(summary: Dict, args) -> bool:
+    """
+    Decide whether a load step has passed the service's capacity.
+
+    Saturated means p99 over the latency budget, too many failed frames,
+    or throughput falling clearly behind the offered frame rate.
+    """
+    if summary["p99"] > args.p99_limit:
+        return True
+    if summary["failure_rate"] > args.max_failure_rate:
+        return True
+    return summary["throughput_fps"] < summary["offered_fps"] * 0.9
+
+
+def print_summary(summary: Dict):
+    """Print one result line."""
+    print(
+        f"sessions={summary.get('sessions', '-'):>4}  "
+        f"offered={summary['offered_fps']:7.2f} fps  "
+        f"throughput={summary['throughput_fps']:7.2f} fps  "
+        f"p50={summary['p50'] * 1000:7.1f}ms  "
+        f"p90={summary['p90'] * 1000:7.1f}ms  "
+        f"p99={summary['p99'] * 1000:7.1f}ms  "
+        f"max={summary['max'] * 1000:7.1f}ms  "
+        f"errors={summary['errors']}  "
+        f"timeouts={summary['timeouts']}  "
+        f"dropped={summary['dropped']}"
+    )
+
+
+def command_run(args, url: str, frame: bytes) -> int:
+    """Run a single load level."""
+    print(f"Running {args.sessions} sessions at {args.fps} fps for {args.duration}s against {url}")
+    summary = run_load(args, url, frame, args.sessions)
+    print_summary(summary)
+    if summary["interrupted"]:
+        return 130
+    return 1 if is_saturated(summary, args) else 0
+
+
+def command_sweep(args, url: str, frame: bytes) -> int:
+    """Step the session count up until the service saturates."""
+    print(f"Sweeping sessions {args.start}..{args.max} (step {args.step}) "
+          f"at {args.fps} fps, p99 limit {args.p99_limit}s, against {url}")
+
+    last_good = None
+    saturated_at = None
+    interrupted = False
+    sessions = args.start
+    while sessions <= args.max:
+        summary = run_load(args, url, frame, sessions)
+        print_summary(summary)
+        if summary["interrupted"]:
+            # A partial step is not judged; keep the results of finished steps
+            interrupted = True
+            break
+        if is_saturated(summary, args):
+            saturated_at = sessions
+            break
+        last_good = summary
+        sessions += args.step
+
+    print()
+    if interrupted:
+        print(f"Interrupted during the {sessions} sessions step")
+    elif saturated_at is not None:
+        print(f"Saturation point: {saturated_at} sessions")
+    else:
+        print(f"No saturation up to {args.max} sessions")
+
+    if last_good is None:
+        return 130 if interrupted else 1
+    print(f"Max sustainable: {last_good['sessions']} sessions "
+          f"({last_good['throughput_fps']:.2f} fps, p99 {last_good['p99'] * 1000:.1f}ms)")
+    return 130 if interrupted else 0
+
+
+def _format_optional(value, fmt: str, missing: str = "-") -> str:
+    """Format value with fmt, or return missing for None."""
+    return missing if value is None else format(value, fmt)
+
+
+def command_soak(args, url: str, frame: bytes) -> int:
+    """Hold a fixed load for a long time while tracking memory growth."""
+    sampler = MemorySampler(pid=args.pid, track_objects=args.track_objects, warmup=args.warmup)
+    try:
+        csv_file = open(args.csv, "w") if args.csv else None
+    except OSError as e:
+        print(f"[X] Cannot open --csv file: {e}")
+        return 2
+
+    print(f"Soaking {args.sessions} sessions at {args.fps} fps for {args.duration}s "
+          f"against {url} (sampling pid {sampler.pid} every {args.sample_interval}s, "
+          f"warm-up {args.warmup}s)")
+    if csv_file:
+        csv_file.write("elapsed,rss_mb,objects,pause,completed_fps,p50,p99,errors,timeouts,dropped\n")
+
+    # The run total is attributed by send time like run_load; the per-sample
+    # windows count frames as they complete, so they can exceed the offered rate
+    offered_fps = args.sessions * args.fps
+    run_stats = LoadStats()
+    window_stats = LoadStats()
+    started = time.perf_counter()
+    run_stats.open_window(started + args.warmup)
+    stop_event, workers = start_sessions(args, url, frame, args.sessions,
+                                         StatsGroup(run_stats, window_stats))
+
+    interrupted = False
+    service_gone = False
+    window_started = started
+    next_sample = started
+    try:
+        while True:
+            # Sample on a fixed schedule so time spent sampling doesn't stretch intervals
+            next_sample = min(next_sample + args.sample_interval, started + args.duration)
+            if next_sample <= window_started:
+                break
+            time.sleep(max(0.0, next_sample - time.perf_counter()))
+
+            now = time.perf_counter()
+            summary = window_stats.summary(now - window_started, offered_fps)
+            window_stats.reset()
+            window_started = now
+
+            sample = sampler.sample(now - started)
+            rss = sample["rss_mb"]
+            if rss is None and any(s["rss_mb"] is not None for s in sampler.samples):
+                service_gone = True
+            print(f"[{sample['elapsed']:8.1f}s] "
+                  f"rss={_format_optional(rss, '.1f')}MB  "
+                  f"objects={_format_optional(sample.get('objects'), 'd')}  "
+                  f"completed={summary['throughput_fps']:.2f} fps  "
+                  f"p99={summary['p99'] * 1000:.1f}ms  "
+                  f"errors={summary['errors']}  "
+                  f"timeouts={summary['timeouts']}  "
+                  f"dropped={summary['dropped']}"
+                  + (f"  gc pause={sample['pause'] * 1000:.0f}ms" if "pause" in sample else ""))
+            if csv_file:
+                csv_file.write(
+                    f"{sample['elapsed']:.1f},{_format_optional(rss, '.2f', '')},"
+                    f"{_format_optional(sample.get('objects'), 'd', '')},"
+                    f"{_format_optional(sample.get('pause'), '.4f', '')},"
+                    f"{summary['throughput_fps']:.3f},{summary['p50']:.4f},{summary['p99']:.4f},"
+                    f"{summary['errors']},{summary['timeouts']},{summary['dropped']}\n"
+                )
+                csv_file.flush()
+    except KeyboardInterrupt:
+        interrupted = True
+        print("\nInterrupted, stopping sessions...")
+    finally:
+        ended = time.perf_counter()
+        run_stats.close_window(ended)
+        stop_sessions(stop_event, workers, args.timeout)
+        if csv_file:
+            csv_file.close()
+
+    print()
+    total = run_stats.summary(max(0.0, ended - started - args.warmup), offered_fps)
+    total["sessions"] = args.sessions
+    print("Whole run (after warm-up):")
+    print_summary(total)
+
+    slope = sampler.rss_slope_mb_per_hour()
+    if slope is None:
+        print("RSS trend: unavailable (needs /proc and at least "
+              f"{sampler.MIN_TREND_SAMPLES} samples over {sampler.MIN_TREND_SPAN:.0f}s after warm-up)")
+    else:
+        print(f"RSS trend: {slope:+.2f} MB/hour")
+    growing = sampler.top_growing_types()
+    if growing:
+        print("Fastest growing object types (includes load generator objects):")
+        for name, count in growing:
+            print(f"   {name}: +{count}")
+
+    if interrupted:
+        return 130
+
+    failed = False
+    if service_gone:
+        print(f"[X] Service process {sampler.pid} is gone")
+        failed = True
+    if is_saturated(total, args):
+        print("[X] Service saturated during the soak (latency, failures or throughput)")
+        failed = True
+    if slope is not None and slope > args.max_rss_growth:
+        print(f"[X] RSS grows faster than {args.max_rss_growth} MB/hour - possible leak")
+        failed = True
+    return 1 if failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line parser."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--url", default=SERVICE_URL, help="Service base URL")
+    common.add_argument("--in-process", action="store_true",
+                        help="Start the FastAPI app from main.py inside this process")
+    common.add_argument("--fps", type=float, default=1.0, help="Frames per second per session")
+    common.add_argument("--image", help="Image file to send (default: synthetic 640x480 JPEG)")
+    common.add_argument("--base64", action="store_true",
+                        help="Use /detect-cheating-base64 instead of multipart upload")
+    common.add_argument("--timeout", type=float, default=PROXY_TIMEOUT * 2,
+                        help="Per-request timeout in seconds (must exceed --p99-limit)")
+    common.add_argument("--p99-limit", type=float, default=PROXY_TIMEOUT,
+                        help="p99 latency in seconds above which the service counts as saturated")
+    common.add_argument("--max-failure-rate", type=float, default=0.01,
+                        help="Fraction of errored/timed-out/dropped frames tolerated")
+
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", parents=[common], help="Run a single load level")
+    run_parser.add_argument("--sessions", type=int, default=10)
+    run_parser.add_argument("--duration", type=float, default=60.0)
+    run_parser.add_argument("--warmup", type=float, default=5.0)
+
+    sweep_parser = subparsers.add_parser("sweep", parents=[common],
+                                         help="Step sessions up to find the saturation point")
+    sweep_parser.add_argument("--start", type=int, default=1)
+    sweep_parser.add_argument("--step", type=int, default=2)
+    sweep_parser.add_argument("--max", type=int, default=64)
+    sweep_parser.add_argument("--duration", type=float, default=30.0,
+                              help="Seconds measured per step")
+    sweep_parser.add_argument("--warmup", type=float, default=5.0)
+
+    soak_parser = subparsers.add_parser("soak", parents=[common],
+                                        help="Hold a fixed load and track memory over time")
+    soak_parser.add_argument("--sessions", type=int, default=10)
+    soak_parser.add_argument("--duration", type=float, default=3600.0)
+    soak_parser.add_argument("--sample-interval", type=float, default=60.0)
+    soak_parser.add_argument("--warmup", type=float, default=300.0,
+                             help="Seconds excluded from the run summary and RSS trend")
+    soak_parser.add_argument("--pid", type=int,
+                             help="PID of the service to sample RSS from (required without --in-process)")
+    soak_parser.add_argument("--max-rss-growth", type=float, default=10.0,
+                             help="RSS growth in MB/hour above which the run fails")
+    soak_parser.add_argument("--csv", help="Write per-sample results to this CSV file")
+    soak_parser.add_argument("--track-objects", action="store_true",
+                             help="Count live objects by type (--in-process only; "
+                                  "pauses the service for each sample)")
+
+    return parser
+
+
+def validate_args(args) -> Optional[str]:
+    """
+    Check argument combinations argparse cannot express.
+
+    Returns:
+        Error message, or None if the arguments are valid
+    """
+    if args.fps <= 0:
+        return "--fps must be positive"
+    if args.duration <= 0:
+        return "--duration must be positive"
+    if args.p99_limit <= 0:
+        return "--p99-limit must be positive"
+    # Timed-out frames count as args.timeout in the percentiles, so it must
+    # exceed the limit for p99 to be able to cross it
+    if args.timeout <= args.p99_limit:
+        return "--timeout must be greater than --p99-limit"
+    if not 0 <= args.max_failure_rate <= 1:
+        return "--max-failure-rate must be between 0 and 1"
+
+    if args.image and not os.path.isfile(args.image):
+        return f"--image file not found: {args.image}"
+
+    if args.warmup < 0:
+        return "--warmup must not be negative"
+    if args.command in ("run", "soak") and args.sessions <= 0:
+        return "--sessions must be positive"
+    if args.command == "sweep":
+        if args.start <= 0:
+            return "--start must be positive"
+        if args.step <= 0:
+            return "--step must be positive"
+        if args.start > args.max:
+            return "--start must not be greater than --max"
+    if args.command == "soak":
+        if args.sample_interval <= 0:
+            return "--sample-interval must be positive"
+        if args.warmup >= args.duration:
+            return "--warmup must be shorter than --duration"
+        if not args.in_process and args.pid is None:
+            return "--pid of the service is required for a soak run without --in-process"
+        if args.track_objects and not args.in_process:
+            return "--track-objects requires --in-process"
+    return None
+
+
+def main() -> int:
+    args = build_parser().parse_args()
+    error = validate_args(args)
+    if error:
+        print(f"[X] {error}")
+        return 2
+
+    try:
+        frame = load_frame(args.image)
+    except OSError as e:
+        print(f"[X] Cannot read --image file: {e}")
+        return 2
+    url = start_in_process_server() if args.in_process else args.url.rstrip("/")
+
+    commands = {"run": command_run, "sweep": command_sweep, "soak": command_soak}
+    return commands[args.command](args, url, frame)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
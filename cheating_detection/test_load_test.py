@@ -0,0 +1,197 @@
+"""
+Unit tests for the load test statistics, saturation check and argument validation.
+Run: python -m unittest test_load_test
+"""
+
+import argparse
+import unittest
+
+from load_test import (
+    LoadStats,
+    MemorySampler,
+    StatsGroup,
+    build_parser,
+    is_saturated,
+    percentile,
+    validate_args,
+)
+
+
+class PercentileTest(unittest.TestCase):
+    def test_empty_list(self):
+        self.assertEqual(percentile([], 99), 0.0)
+
+    def test_single_value(self):
+        self.assertEqual(percentile([3.0], 0), 3.0)
+        self.assertEqual(percentile([3.0], 100), 3.0)
+
+    def test_nearest_rank(self):
+        values = [1.0, 2.0, 3.0, 4.0]
+        self.assertEqual(percentile(values, 0), 1.0)
+        self.assertEqual(percentile(values, 25), 1.0)
+        self.assertEqual(percentile(values, 50), 2.0)
+        self.assertEqual(percentile(values, 51), 3.0)
+        self.assertEqual(percentile(values, 100), 4.0)
+
+    def test_p99_of_hundred(self):
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual(percentile(values, 99), 99.0)
+
+
+class LoadStatsTest(unittest.TestCase):
+    def test_counts_frames_by_send_time(self):
+        stats = LoadStats()
+        stats.open_window(10.0)
+        stats.record(9.9, 0.1, "ok")     # sent during warm-up
+        stats.record(10.0, 0.2, "ok")
+        stats.record(19.9, 0.3, "ok")    # finishes after close, still counted
+        stats.close_window(20.0)
+        stats.record(20.0, 0.4, "ok")    # sent after close
+
+        summary = stats.summary(10.0, 1.0)
+        self.assertEqual(summary["sent"], 2)
+        self.assertEqual(summary["ok"], 2)
+        self.assertEqual(summary["max"], 0.3)
+        self.assertAlmostEqual(summary["throughput_fps"], 0.2)
+
+    def test_open_window_discards_earlier_results(self):
+        stats = LoadStats()
+        stats.record(1.0, 0.1, "ok")
+        stats.open_window(5.0)
+        self.assertEqual(stats.summary(1.0, 1.0)["sent"], 0)
+
+    def test_dropped_frames_use_due_time(self):
+        stats = LoadStats()
+        stats.open_window(10.0)
+        stats.record_dropped(9.0, 3)
+        stats.record_dropped(12.0, 2)
+        stats.close_window(20.0)
+        stats.record_dropped(21.0, 4)
+        self.assertEqual(stats.summary(10.0, 1.0)["dropped"], 2)
+
+    def test_timeouts_stay_in_latency_tail(self):
+        stats = LoadStats()
+        for _ in range(95):
+            stats.record(0.0, 0.1, "ok")
+        for _ in range(5):
+            stats.record(0.0, 10.0, "timeout")
+
+        summary = stats.summary(100.0, 1.0)
+        self.assertEqual(summary["p50"], 0.1)
+        self.assertEqual(summary["p99"], 10.0)
+        self.assertEqual(summary["timeouts"], 5)
+        self.assertAlmostEqual(summary["failure_rate"], 0.05)
+
+    def test_failure_rate_includes_dropped(self):
+        stats = LoadStats()
+        stats.record(0.0, 0.1, "ok")
+        stats.record(0.0, 0.1, "error")
+        stats.record_dropped(0.0, 2)
+        self.assertAlmostEqual(stats.summary(1.0, 1.0)["failure_rate"], 0.75)
+
+    def test_group_forwards_to_each_window(self):
+        run_stats = LoadStats()
+        run_stats.open_window(10.0)
+        window_stats = LoadStats()
+        group = StatsGroup(run_stats, window_stats)
+        group.record(5.0, 0.1, "ok")
+        group.record_dropped(5.0, 1)
+
+        self.assertEqual(run_stats.summary(1.0, 1.0)["sent"], 0)
+        self.assertEqual(window_stats.summary(1.0, 1.0)["sent"], 1)
+        self.assertEqual(window_stats.summary(1.0, 1.0)["dropped"], 1)
+
+
+class IsSaturatedTest(unittest.TestCase):
+    def setUp(self):
+        self.args = argparse.Namespace(p99_limit=5.0, max_failure_rate=0.01)
+        self.summary = {
+            "p99": 1.0,
+            "failure_rate": 0.0,
+            "throughput_fps": 10.0,
+            "offered_fps": 10.0,
+        }
+
+    def test_healthy(self):
+        self.assertFalse(is_saturated(self.summary, self.args))
+
+    def test_p99_over_limit(self):
+        self.summary["p99"] = 5.1
+        self.assertTrue(is_saturated(self.summary, self.args))
+
+    def test_failure_rate_over_limit(self):
+        self.summary["failure_rate"] = 0.02
+        self.assertTrue(is_saturated(self.summary, self.args))
+
+    def test_throughput_behind_offered(self):
+        self.summary["throughput_fps"] = 8.9
+        self.assertTrue(is_saturated(self.summary, self.args))
+        self.summary["throughput_fps"] = 9.0
+        self.assertFalse(is_saturated(self.summary, self.args))
+
+
+class ValidateArgsTest(unittest.TestCase):
+    def validate(self, *argv):
+        return validate_args(build_parser().parse_args(list(argv)))
+
+    def test_defaults_are_valid(self):
+        self.assertIsNone(self.validate("run"))
+        self.assertIsNone(self.validate("sweep"))
+        self.assertIsNone(self.validate("soak", "--pid", "1"))
+
+    def test_sweep_bounds(self):
+        self.assertIn("--step", self.validate("sweep", "--step", "0"))
+        self.assertIn("--start", self.validate("sweep", "--start", "0"))
+        self.assertIn("--max", self.validate("sweep", "--start", "5", "--max", "2"))
+
+    def test_non_positive_values(self):
+        self.assertIn("--sessions", self.validate("run", "--sessions", "0"))
+        self.assertIn("--duration", self.validate("run", "--duration", "0"))
+        self.assertIn("--fps", self.validate("run", "--fps", "0"))
+
+    def test_timeout_must_exceed_p99_limit(self):
+        self.assertIn("--timeout", self.validate("run", "--timeout", "5", "--p99-limit", "5"))
+
+    def test_missing_image(self):
+        self.assertIn("--image", self.validate("run", "--image", "does-not-exist.jpg"))
+
+    def test_soak_options(self):
+        self.assertIn("--pid", self.validate("soak"))
+        self.assertIn("--warmup", self.validate("soak", "--pid", "1", "--duration", "60"))
+        self.assertIn("--track-objects", self.validate("soak", "--pid", "1", "--track-objects"))
+
+
+class RssSlopeTest(unittest.TestCase):
+    def sampler_with(self, points, warmup=0.0):
+        sampler = MemorySampler(warmup=warmup)
+        sampler.samples = [{"elapsed": t, "rss_mb": rss} for t, rss in points]
+        return sampler
+
+    def test_short_run_has_no_trend(self):
+        # Start-up growth over a few seconds must not be reported as a leak
+        sampler = self.sampler_with([(t, 100.0 + 0.2 * t) for t in range(1, 6)])
+        self.assertIsNone(sampler.rss_slope_mb_per_hour())
+
+    def test_needs_minimum_samples(self):
+        sampler = self.sampler_with([(0.0, 100.0), (600.0, 100.0), (1200.0, 100.0)])
+        self.assertIsNone(sampler.rss_slope_mb_per_hour())
+
+    def test_warmup_excluded_by_time(self):
+        # 50 MB of start-up allocation, then flat
+        points = [(t, 50.0 + t / 6.0) for t in range(0, 300, 60)]
+        points += [(t, 100.0) for t in range(300, 3601, 60)]
+        sampler = self.sampler_with(points, warmup=300.0)
+        self.assertAlmostEqual(sampler.rss_slope_mb_per_hour(), 0.0)
+
+    def test_steady_growth(self):
+        points = [(t, 100.0 + 2.0 * t / 3600.0) for t in range(300, 3601, 60)]
+        sampler = self.sampler_with(points, warmup=300.0)
+        self.assertAlmostEqual(sampler.rss_slope_mb_per_hour(), 2.0)
+
+    def test_missing_rss_ignored(self):
+        points = [(t, None) for t in range(0, 3601, 60)]
+        self.assertIsNone(self.sampler_with(points).rss_slope_mb_per_hour())
+
+
+if __name__ == "__main__":
+    unittest.main()